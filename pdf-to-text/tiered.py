@@ -0,0 +1,214 @@
+import os
+import csv
+import logging
+from statistics import mean
+import numpy as np
+from pdf2image import convert_from_path, pdfinfo_from_path
+import pytesseract
+from tqdm import tqdm
+
+# ---------- Configuration ----------
+TESSERACT_LANG = 'eng'    # fast tier   (same engine as extract.py / index.js)
+EASYOCR_LANGS = ['en']    # slow tier   (same engine as gpu.py)
+EASYOCR_GPU = True
+DPI = 300
+
+# Routing, on tesseract's 0-100 word confidence
+PAGE_THRESHOLD = 60      # below this the whole page goes to EasyOCR
+LINE_THRESHOLD = 70      # below this a single line is re-read by EasyOCR
+WEAK_LINE_SHARE = 0.5    # more weak lines than this and the whole page goes instead
+LINE_PADDING = 8         # px around a line box so EasyOCR sees whole glyphs
+MIN_PAGE_WORDS = 3       # fewer words (stray marks, page numbers) never re-read the whole page
+
+# Acceptance, on EasyOCR's own 0-1 probability x100. The two engines' scores
+# are not calibrated against each other, so EasyOCR text replaces tesseract's
+# only when it clears these bars by itself, not when it merely scores higher.
+EASYOCR_PAGE_ACCEPT = 60
+EASYOCR_LINE_ACCEPT = 70
+
+input_dir = "./input"
+output_dir = "./output"
+os.makedirs(output_dir, exist_ok=True)
+
+# ---------- Logging ----------
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# ---------- Engines ----------
+_easyocr_reader = None
+
+
+def get_easyocr_reader():
+    """Load EasyOCR only the first time a page actually needs it."""
+    global _easyocr_reader
+    if _easyocr_reader is None:
+        import easyocr
+        logging.info("Initializing EasyOCR reader...")
+        _easyocr_reader = easyocr.Reader(EASYOCR_LANGS, gpu=EASYOCR_GPU)
+    return _easyocr_reader
+
+
+def tesseract_lines(image):
+    """Run tesseract once and group its words into lines with a mean confidence."""
+    data = pytesseract.image_to_data(image, lang=TESSERACT_LANG, output_type=pytesseract.Output.DICT)
+    lines = {}
+    for i, word in enumerate(data['text']):
+        conf = float(data['conf'][i])
+        if conf < 0 or not word.strip():
+            continue  # layout rows (blocks/paragraphs) carry conf -1
+
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        line = lines.setdefault(key, {'words': [], 'confs': [], 'box': None})
+        line['words'].append(word)
+        line['confs'].append(conf)
+
+        left, top = data['left'][i], data['top'][i]
+        right, bottom = left + data['width'][i], top + data['height'][i]
+        box = line['box']
+        line['box'] = (left, top, right, bottom) if box is None else (
+            min(box[0], left), min(box[1], top), max(box[2], right), max(box[3], bottom))
+
+    return [
+        {'key': key, 'text': " ".join(line['words']), 'conf': mean(line['confs']), 'box': line['box']}
+        for key, line in sorted(lines.items())
+    ]
+
+
+def easyocr_read(image):
+    """Detect and read a whole page. Returns (text, confidence 0-100)."""
+    results = get_easyocr_reader().readtext(np.array(image), detail=1, paragraph=False)
+    if not results:
+        return "", 0.0
+    text = "\n".join(r[1] for r in results)
+    return text, mean(r[2] for r in results) * 100
+
+
+def easyocr_recognize_lines(image, boxes):
+    """
+    Read many (left, top, right, bottom) boxes in one batched recognition
+    call, skipping EasyOCR's detector since tesseract already found the lines.
+    Returns {box: (text, confidence 0-100)}.
+    """
+    horizontal = [[left, right, top, bottom] for left, top, right, bottom in boxes]
+    results = get_easyocr_reader().recognize(
+        np.array(image), horizontal_list=horizontal, free_list=[],
+        batch_size=min(len(boxes), 32), detail=1, paragraph=False)
+    # Results come back sorted by position; key them by their top-left corner
+    by_corner = {(int(r[0][0][0]), int(r[0][0][1])): (r[1], r[2] * 100) for r in results}
+    return {box: by_corner[box[:2]] for box in boxes if box[:2] in by_corner}
+
+
+def join_lines(lines):
+    text, previous = [], None
+    for line in lines:
+        if previous and line['key'][:2] != previous:
+            text.append("")  # blank line between paragraphs
+        text.append(line['text'])
+        previous = line['key'][:2]
+    return "\n".join(text)
+
+
+# ---------- Routing ----------
+def ocr_page_tiered(image):
+    """
+    Tesseract first; EasyOCR re-reads only what tesseract was unsure of:
+    - the whole page, when its mean confidence is below PAGE_THRESHOLD or
+      more than WEAK_LINE_SHARE of its lines are below LINE_THRESHOLD;
+    - otherwise just the lines below LINE_THRESHOLD, in one batched call.
+    Wordless pages, and pages with fewer than MIN_PAGE_WORDS words for the
+    whole-page case, are left to tesseract.
+
+    EasyOCR text is kept only when its own confidence clears
+    EASYOCR_PAGE_ACCEPT / EASYOCR_LINE_ACCEPT; the two engines' scores are
+    never compared with each other.
+
+    Returns (text, engine, confidence, page_rerouted, rerouted_lines), where
+    confidence is EasyOCR's for an 'easyocr' page and tesseract's otherwise.
+    """
+    lines = tesseract_lines(image)
+    if not lines:
+        # Blank or image-only page: EasyOCR would find nothing worth keeping either
+        return "", 'tesseract', 0.0, False, 0
+
+    page_conf = mean(line['conf'] for line in lines)
+    word_count = sum(len(line['text'].split()) for line in lines)
+    weak = [line for line in lines if line['conf'] < LINE_THRESHOLD]
+    if not weak:
+        return join_lines(lines), 'tesseract', page_conf, False, 0
+
+    if word_count >= MIN_PAGE_WORDS and (
+            page_conf < PAGE_THRESHOLD or len(weak) > WEAK_LINE_SHARE * len(lines)):
+        text, conf = easyocr_read(image)
+        if conf >= EASYOCR_PAGE_ACCEPT:
+            return text, 'easyocr', conf, True, 0
+        return join_lines(lines), 'tesseract', page_conf, False, 0
+
+    boxes = {}
+    for line in weak:
+        left, top, right, bottom = line['box']
+        box = (
+            max(left - LINE_PADDING, 0),
+            max(top - LINE_PADDING, 0),
+            min(right + LINE_PADDING, image.width),
+            min(bottom + LINE_PADDING, image.height),
+        )
+        boxes[box] = line
+
+    rerouted = 0
+    for box, (text, conf) in easyocr_recognize_lines(image, list(boxes)).items():
+        if text and conf >= EASYOCR_LINE_ACCEPT:
+            boxes[box]['text'] = text
+            rerouted += 1
+
+    engine = 'tesseract+easyocr' if rerouted else 'tesseract'
+    return join_lines(lines), engine, page_conf, False, rerouted
+
+
+# ---------- Process one PDF with incremental writing ----------
+def process_pdf(pdf_path):
+    try:
+        total_pages = pdfinfo_from_path(pdf_path).get("Pages", 0)
+    except Exception as e:
+        logging.error(f"Failed to read PDF info: {e}")
+        return
+
+    base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+    output_path = os.path.join(output_dir, f"output_{base_name}.txt")
+    routing_path = os.path.join(output_dir, f"output_{base_name}.routing.csv")
+
+    logging.info(f"🔎 Tiered OCR started for: {os.path.basename(pdf_path)} ({total_pages} pages)")
+    engines = {}
+    with open(output_path, "w", encoding="utf-8") as f, \
+            open(routing_path, "w", newline="", encoding="utf-8") as r:
+        routing = csv.writer(r)
+        routing.writerow(['page', 'engine', 'confidence', 'page_rerouted', 'rerouted_lines'])
+
+        for i in tqdm(range(1, total_pages + 1), desc="OCR Progress"):
+            try:
+                page = convert_from_path(pdf_path, dpi=DPI, first_page=i, last_page=i)[0]
+                text, engine, conf, page_rerouted, rerouted = ocr_page_tiered(page)
+            except Exception as e:
+                logging.error(f"OCR failed on page {i}: {e}")
+                text, engine, conf, page_rerouted, rerouted = "", 'failed', 0.0, False, 0
+
+            f.write(f"\n--- Page {i} ---\n{text}\n")
+            f.flush()
+            routing.writerow([i, engine, f"{conf:.1f}", int(page_rerouted), rerouted])
+            engines[engine] = engines.get(engine, 0) + 1
+
+    logging.info(f"✅ OCR output saved: {output_path}")
+    logging.info(f"📊 Pages per engine: {engines}")
+
+
+# ---------- Main ----------
+def main():
+    pdf_files = [os.path.join(input_dir, f) for f in os.listdir(input_dir) if f.lower().endswith(".pdf")]
+    if not pdf_files:
+        logging.warning("⚠ No PDF files found in ./input")
+        return
+
+    for pdf_file in pdf_files:
+        process_pdf(pdf_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 import os
 import re
 import json
@@ -12,6 +13,15 @@ import sys
 import xml.etree.ElementTree as ET
 import html
 import asyncio
+import multiprocessing
+import shutil
+import tempfile
+import concurrent.futures
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from pdf2image import pdfinfo_from_path
+from ocr_worker import init_worker, warmup, ocr_page, download_models
 
 # Configure logging
 logging.basicConfig(
@@ -23,7 +33,62 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# Workers are single-threaded; half the cores leaves room for rendering
+# (pdftoppm) and the API itself. See ocr_worker.py for sizing with EasyOCR.
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+ocr_pool = None
+ocr_pool_lock = asyncio.Lock()
+ocr_restart_task = None
+
+async def start_ocr_pool():
+    """Start the OCR process pool with models already loaded in every worker"""
+    global ocr_pool
+    pool = ProcessPoolExecutor(
+        max_workers=OCR_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+    )
+    try:
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(pool, warmup) for _ in range(OCR_WORKERS)))
+        ocr_pool = pool
+        logger.info(f"OCR pool ready with {OCR_WORKERS} workers")
+    except Exception as e:
+        # Keep the rest of the API up; /api/ocr answers 503 instead
+        logger.error(f"OCR pool failed to start: {e}")
+        pool.shutdown(wait=False, cancel_futures=True)
+
+async def restart_ocr_pool(broken_pool):
+    """Replace a pool whose worker died; /api/ocr answers 503 meanwhile"""
+    global ocr_pool
+    async with ocr_pool_lock:
+        if ocr_pool is not broken_pool:
+            return  # another job already noticed and restarted it
+        ocr_pool = None
+        if broken_pool:
+            broken_pool.shutdown(wait=False, cancel_futures=True)
+            logger.warning("OCR pool broken (a worker died), restarting")
+        await start_ocr_pool()
+
+def schedule_ocr_pool_restart(broken_pool):
+    global ocr_restart_task
+    if ocr_restart_task is None or ocr_restart_task.done():
+        ocr_restart_task = asyncio.create_task(restart_ocr_pool(broken_pool))
+
+@asynccontextmanager
+async def lifespan(app):
+    try:
+        await asyncio.to_thread(download_models)
+    except Exception as e:
+        logger.error(f"EasyOCR model download failed: {e}")
+    await start_ocr_pool()
+
+    yield
+
+    if ocr_pool:
+        ocr_pool.shutdown(cancel_futures=True)
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -245,6 +310,118 @@ async def download_subtitles(request: VideoRequest):
         media_type="application/x-ndjson"
     )
 
+async def generate_ocr_progress(pool, pdf_path: str, filename: str, lang: str, tasks: list, futures: list):
+    """OCR every page on the shared pool and stream each page as it finishes.
+
+    `tasks` and `futures` are filled in here and drained by cleanup_ocr_job.
+    """
+    # Cap this job's pages in flight so concurrent uploads share the pool fairly
+    slots = asyncio.Semaphore(OCR_WORKERS)
+
+    async def run_page(page_number):
+        async with slots:
+            try:
+                future = pool.submit(ocr_page, pdf_path, page_number, lang)
+                futures.append(future)
+                return await asyncio.wrap_future(future)
+            except BrokenProcessPool:
+                raise  # the pool is gone, not this page: fail the whole job
+            except Exception as e:
+                logger.error(f"OCR failed on page {page_number}: {e}")
+                return {"page": page_number, "text": "", "engine": "failed", "confidence": 0.0, "error": str(e)}
+
+    try:
+        info = await asyncio.to_thread(pdfinfo_from_path, pdf_path)
+        total = info.get("Pages", 0)
+
+        yield json.dumps({
+            "type": "progress",
+            "message": f"📄 {filename}: {total} pages queued",
+            "current": 0,
+            "total": total
+        }) + "\n"
+
+        tasks.extend(asyncio.create_task(run_page(i)) for i in range(1, total + 1))
+        pages = {}
+
+        for done, next_page in enumerate(asyncio.as_completed(tasks), 1):
+            result = await next_page
+            pages[result["page"]] = result
+            icon = "❌" if result["engine"] == "failed" else "✅"
+
+            yield json.dumps({
+                "type": "progress",
+                "message": f"{icon} Page {result['page']} ({result['engine']}, {result['confidence']})",
+                "current": done,
+                "total": total,
+                **result
+            }) + "\n"
+
+        combined_text = "\n".join(
+            f"\n--- Page {i} ---\n{pages[i]['text']}" for i in sorted(pages)
+        ).strip()
+
+        yield json.dumps({
+            "type": "complete",
+            "success": True,
+            "title": filename,
+            "text": combined_text,
+            "page_count": total,
+            "message": f"✨ Completed! OCR'd {total} page(s)"
+        }) + "\n"
+
+    except BrokenProcessPool:
+        schedule_ocr_pool_restart(pool)
+        yield json.dumps({
+            "type": "error",
+            "message": "OCR workers crashed and are restarting, please retry shortly"
+        }) + "\n"
+    except Exception as e:
+        logger.error(f"Error: {e}")
+        yield json.dumps({
+            "type": "error",
+            "message": str(e)
+        }) + "\n"
+
+async def cleanup_ocr_job(pdf_path: str, tasks: list, futures: list):
+    """Runs after the response ends, client disconnects included.
+
+    Pages not started yet are dropped; pages already in a worker are waited
+    for, since they still have the PDF open (Windows refuses to delete it).
+    """
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for future in futures:
+        future.cancel()
+    await asyncio.to_thread(concurrent.futures.wait, futures)
+    os.remove(pdf_path)
+
+@app.post("/api/ocr")
+async def ocr_pdf(file: UploadFile = File(...), lang: str = Form("eng")):
+    pool = ocr_pool
+    if pool is None:
+        # Pool is restarting, or the last start failed: try again in the background
+        schedule_ocr_pool_restart(None)
+        raise HTTPException(status_code=503, detail="OCR workers are not available")
+    if not file.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        try:
+            await asyncio.to_thread(shutil.copyfileobj, file.file, tmp)
+        except Exception:
+            tmp.close()
+            os.remove(tmp.name)
+            raise
+
+    tasks, futures = [], []
+    return StreamingResponse(
+        generate_ocr_progress(pool, tmp.name, file.filename, lang, tasks, futures),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(cleanup_ocr_job, tmp.name, tasks, futures)
+    )
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.environ.get("PORT", 8000))
@@ -0,0 +1,138 @@
+"""OCR worker functions for the /api/ocr endpoint.
+
+These run inside a ProcessPoolExecutor. `init_worker` loads the OCR models
+once per process, so every page a worker handles after that skips the
+model load. EasyOCR is optional: without it, pages are read by Tesseract only.
+
+Each worker is pinned to one thread (Tesseract's OpenMP and torch would
+otherwise each use every core), so parallelism comes from the number of
+workers alone. With EasyOCR installed every worker also holds one model
+per language set in OCR_EASYOCR_LANGS, roughly 1 GB of RAM each on CPU,
+so size OCR_WORKERS to memory as well as cores, and keep it small when
+OCR_EASYOCR_GPU=1 since all workers share the one GPU.
+
+The EasyOCR fallback only runs when one of those preloaded sets covers the
+request's Tesseract language; other languages are Tesseract only.
+"""
+import logging
+import os
+from statistics import mean
+
+import pytesseract
+from pdf2image import convert_from_path
+
+logger = logging.getLogger(__name__)
+
+DPI = int(os.environ.get("OCR_DPI", 300))
+# EasyOCR language sets to preload, ";" between sets, e.g. "en;fa,en"
+EASYOCR_LANG_SETS = [
+    frozenset(langs.split(","))
+    for langs in os.environ.get("OCR_EASYOCR_LANGS", "en").split(";") if langs
+]
+EASYOCR_GPU = os.environ.get("OCR_EASYOCR_GPU", "0") == "1"
+# Pages whose mean Tesseract word confidence (0-100) falls below this are re-read by EasyOCR
+FALLBACK_THRESHOLD = float(os.environ.get("OCR_FALLBACK_THRESHOLD", 60))
+# EasyOCR's own probability (x100) needed to replace the Tesseract text; the two
+# engines' scores are not calibrated against each other, so they are never compared
+EASYOCR_ACCEPT = float(os.environ.get("OCR_EASYOCR_ACCEPT", 60))
+
+# Tesseract traineddata names -> EasyOCR language codes
+TESSERACT_TO_EASYOCR = {
+    "eng": "en", "fas": "fa", "ara": "ar", "urd": "ur", "deu": "de", "fra": "fr",
+    "spa": "es", "ita": "it", "rus": "ru", "tur": "tr", "chi_sim": "ch_sim",
+    "jpn": "ja", "kor": "ko",
+}
+
+_easyocr_readers = {}
+
+
+def easyocr_reader(lang):
+    """Preloaded reader covering a Tesseract lang like "fas+eng", or None."""
+    codes = {TESSERACT_TO_EASYOCR.get(part) for part in lang.split("+")}
+    for langs, reader in _easyocr_readers.items():
+        if codes <= langs:
+            return reader
+    return None
+
+
+def download_models():
+    """Fetch EasyOCR model files once, in the parent, before any worker starts.
+
+    Otherwise every freshly spawned worker downloads the same files at once.
+    """
+    try:
+        import easyocr
+    except ImportError:
+        return
+    for langs in EASYOCR_LANG_SETS:
+        easyocr.Reader(sorted(langs), gpu=False, verbose=False)
+
+
+def init_worker():
+    """Per-process initializer: load models once, up front."""
+    # One thread per worker: inherited by the tesseract subprocess, and read
+    # by torch's OpenMP runtime when easyocr imports it below
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    os.environ["OMP_NUM_THREADS"] = "1"
+    pytesseract.get_tesseract_version()  # fail fast if the binary is missing
+    try:
+        import easyocr
+        import torch
+    except ImportError:
+        logger.info("easyocr not installed, using Tesseract only")
+        return
+
+    torch.set_num_threads(1)
+    for langs in EASYOCR_LANG_SETS:
+        try:
+            # Files come from download_models(); never fetch from every worker
+            _easyocr_readers[langs] = easyocr.Reader(
+                sorted(langs), gpu=EASYOCR_GPU, download_enabled=False, verbose=False)
+        except Exception as e:
+            logger.error(f"EasyOCR {sorted(langs)} unavailable, Tesseract only for it: {e}")
+
+
+def warmup():
+    """No-op task used to make the pool start (and initialize) its processes."""
+    return os.getpid()
+
+
+def tesseract_read(image, lang):
+    """One Tesseract pass: text rebuilt line by line plus mean word confidence."""
+    data = pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+    lines, confs = {}, []
+    for i, word in enumerate(data["text"]):
+        conf = float(data["conf"][i])
+        if conf < 0 or not word.strip():
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
+        confs.append(conf)
+
+    text = "\n".join(" ".join(words) for _, words in sorted(lines.items()))
+    return text, mean(confs) if confs else 0.0
+
+
+def ocr_page(pdf_path, page_number, lang="eng"):
+    """Render and OCR a single page. Returns a dict ready to send as an event."""
+    image = convert_from_path(pdf_path, dpi=DPI, first_page=page_number, last_page=page_number)[0]
+
+    text, confidence = tesseract_read(image, lang)
+    engine = "tesseract"
+
+    reader = easyocr_reader(lang)
+    if confidence < FALLBACK_THRESHOLD and reader is not None:
+        import numpy as np
+        results = reader.readtext(np.array(image), detail=1, paragraph=False)
+        easy_conf = mean(r[2] for r in results) * 100 if results else 0.0
+        if easy_conf >= EASYOCR_ACCEPT:
+            text = "\n".join(r[1] for r in results)
+            confidence = easy_conf
+            engine = "easyocr"
+
+    return {
+        "page": page_number,
+        "text": text.strip(),
+        "engine": engine,
+        "confidence": round(confidence, 1),
+    }
@@ -0,0 +1,65 @@
+"""
+Time each extr.py mode against the local fake WordPress server.
+
+    python bench.py --posts 5000 --latency 0.05 --max-in-flight 8
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import extr
+from fake_wp_server import POSTS_PATH, make_server, touch_posts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extr.py fetch modes offline")
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--max-in-flight', type=int, default=8)
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="share of pages answered with 429/503")
+    parser.add_argument('--touch', type=int, default=50, help="posts edited before the delta sync")
+    args = parser.parse_args()
+
+    server = make_server(args.posts, args.latency, args.fail_rate, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}{POSTS_PATH}"
+
+    runs = {
+        'sequential': lambda: extr.fetch_pages_and_write(args.per_page, base_url),
+        'concurrent': lambda: extr.fetch_pages_concurrent_and_write(
+            args.per_page, args.max_in_flight, base_url),
+        'concurrent (lean)': lambda: extr.fetch_pages_concurrent_and_write(
+            args.per_page, args.max_in_flight, base_url, lean=True),
+        'incremental (first run)': lambda: extr.sync_incremental(args.per_page, base_url),
+        'incremental (delta)': lambda: (
+            touch_posts(server.posts, args.touch),
+            extr.sync_incremental(args.per_page, base_url)),
+    }
+
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # extr writes into the cwd; step back out before the temp dir is
+        # removed, Windows refuses to delete a process's current directory
+        os.chdir(tmp)
+        try:
+            for name, run in runs.items():
+                server.bytes_sent = 0
+                started = time.perf_counter()
+                run()
+                results[name] = (time.perf_counter() - started, server.bytes_sent)
+        finally:
+            os.chdir(cwd)
+
+    server.shutdown()
+
+    print("\n📊 Results")
+    for name, (seconds, sent) in results.items():
+        print(f"   {name:<24} {seconds:7.2f}s  {sent / 1e6:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Offline check that the incremental sync never loses posts when posts are
+edited between an interrupted run and its resume, or in the middle of a run.
+
+    python check_sync.py
+"""
+import contextlib
+import csv
+import io
+import os
+import tempfile
+import threading
+
+import extr
+from fake_wp_server import POSTS_PATH, make_server, touch_posts
+
+POSTS = 1000
+PER_PAGE = 100
+
+
+def stored_ids():
+    with open(extr.OUTPUT_FILE, newline='', encoding='utf-8') as f:
+        return {int(row[0]) for row in list(csv.reader(f))[1:]}
+
+
+def run_scenario(name, server, base_url, on_page, stop):
+    """Sync with `on_page(n)` called after the n-th saved page; raise if `stop(n)`."""
+    for path in (extr.OUTPUT_FILE, extr.STATE_FILE, extr.IDS_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+
+    save_state = extr.save_state
+    saved = [0]
+
+    def hooked(state):
+        save_state(state)
+        saved[0] += 1
+        on_page(saved[0])
+        if stop(saved[0]):
+            raise KeyboardInterrupt
+
+    extr.save_state = hooked
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            extr.sync_incremental(PER_PAGE, base_url)
+        except KeyboardInterrupt:
+            extr.save_state = save_state
+            extr.sync_incremental(PER_PAGE, base_url)
+        finally:
+            extr.save_state = save_state
+
+    missing = set(range(1, POSTS + 1)) - stored_ids()
+    print(f"{'✅' if not missing else '❌'} {name}: {POSTS - len(missing)}/{POSTS} posts stored")
+    return not missing
+
+
+def main():
+    cwd = os.getcwd()
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            # Fresh server per scenario so earlier edits don't leak in
+            for name, touch_at, stop_at in [
+                ("edits between interrupt and resume", 5, 5),
+                ("edits in the middle of a run", 5, None),
+            ]:
+                server = make_server(POSTS, latency=0, port=0)
+                threading.Thread(target=server.serve_forever, daemon=True).start()
+                base_url = f"http://127.0.0.1:{server.server_address[1]}{POSTS_PATH}"
+
+                def on_page(n, server=server, touch_at=touch_at):
+                    if n == touch_at:
+                        touch_posts(server.posts, 20)  # oldest posts, i.e. already fetched
+
+                ok &= run_scenario(name, server, base_url, on_page, lambda n, stop_at=stop_at: n == stop_at)
+                server.shutdown()
+        finally:
+            os.chdir(cwd)
+
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
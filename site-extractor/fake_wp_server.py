@@ -0,0 +1,152 @@
+"""
+Local stand-in for the WordPress REST posts endpoint, so extr.py can be
+benchmarked offline.
+
+    python fake_wp_server.py --posts 20000 --latency 0.05
+    python extr.py --mode concurrent --base-url http://127.0.0.1:8081/wp-json/wp/v2/posts
+"""
+import argparse
+import gzip
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+POSTS_PATH = "/wp-json/wp/v2/posts"
+
+
+WORDS = ("market fund advisor client portfolio tax retirement estate insurance rate "
+         "bond equity income risk plan wealth pension return growth policy").split()
+
+
+def make_posts(count):
+    """Synthetic posts, newest first like WordPress' default ordering."""
+    start = datetime(2020, 1, 1)
+    rng = random.Random(0)
+    posts = []
+    for i in range(count, 0, -1):
+        date = (start + timedelta(hours=i)).isoformat()
+        body = " ".join(rng.choice(WORDS) for _ in range(800))
+        posts.append({
+            'id': i,
+            'date': date,
+            'modified': date,
+            'title': {'rendered': f"Post {i}"},
+            'link': f"http://127.0.0.1/post-{i}/",
+            'author': i % 50,
+            'categories': [i % 7, i % 13],
+            'content': {'rendered': f"<p>{body}</p>"},
+            'excerpt': {'rendered': f"<p>{body[:200]}</p>"},
+        })
+    return posts
+
+
+def make_handler(posts, latency, fail_rate):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path.rstrip('/') != POSTS_PATH:
+                self.send_json(404, {'code': 'rest_no_route'})
+                return
+
+            query = parse_qs(url.query)
+            per_page = int(query.get('per_page', ['10'])[0])
+            page = int(query.get('page', ['1'])[0])
+            orderby = query.get('orderby', ['date'])[0]
+            order = query.get('order', ['desc'])[0]
+
+            matches = posts
+            if 'modified_after' in query:
+                cutoff = query['modified_after'][0]
+                matches = [p for p in matches if p['modified'] > cutoff]
+            if orderby in ('date', 'modified', 'id'):
+                matches = sorted(matches, key=lambda p: (p[orderby], p['id']), reverse=order == 'desc')
+
+            total_pages = max(1, math.ceil(len(matches) / per_page))
+            if page > total_pages:
+                self.send_json(400, {'code': 'rest_post_invalid_page_number'})
+                return
+
+            if latency:
+                time.sleep(latency)
+
+            # Transient failures so the client's retry/backoff gets exercised
+            if random.random() < fail_rate:
+                self.send_json(random.choice([429, 503]), {'code': 'rest_unavailable'}, {'Retry-After': '0'})
+                return
+
+            start = (page - 1) * per_page
+            batch = matches[start:start + per_page]
+            if '_fields' in query:
+                fields = query['_fields'][0].split(',')
+                batch = [{k: p[k] for k in fields if k in p} for p in batch]
+
+            self.send_json(200, batch, {
+                'X-WP-Total': str(len(matches)),
+                'X-WP-TotalPages': str(total_pages),
+            })
+
+        def send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode('utf-8')
+            gzipped = 'gzip' in self.headers.get('Accept-Encoding', '')
+            if gzipped:
+                body = gzip.compress(body, compresslevel=6)
+
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=UTF-8')
+            if gzipped:
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+            with self.server.stats_lock:
+                self.server.bytes_sent += len(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def touch_posts(posts, count):
+    """Simulate edits: bump `modified` on the `count` oldest posts."""
+    now = datetime.now().isoformat(timespec='seconds')
+    for p in posts[-count:]:
+        p['modified'] = now
+
+
+def make_server(posts=5000, latency=0.05, fail_rate=0.0, host='127.0.0.1', port=8081):
+    posts = make_posts(posts)
+    server = ThreadingHTTPServer((host, port), make_handler(posts, latency, fail_rate))
+    server.posts = posts
+    server.bytes_sent = 0
+    server.stats_lock = threading.Lock()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake WordPress posts API")
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds added to every page")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="share of pages answered with 429/503")
+    parser.add_argument('--port', type=int, default=8081)
+    args = parser.parse_args()
+
+    server = make_server(args.posts, args.latency, args.fail_rate, port=args.port)
+    print(f"🧪 Serving {args.posts} fake posts on http://127.0.0.1:{args.port}{POSTS_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()